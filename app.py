@@ -1,18 +1,24 @@
 import streamlit as st
+import asyncio
 import json
 import os
-from datetime import datetime, timedelta
-from openai import OpenAI
-import requests
-from bs4 import BeautifulSoup
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING
 import sqlite3
-import pandas as pd
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+import secrets
+import string
+import threading
 import atexit
-import time
 import hashlib
+import time
 from dotenv import load_dotenv
+from config import (DB_NAME, DB_TIMEOUT, MAX_CONCURRENT_CHECKS, MAX_API_CALLS_PER_SECOND,
+                    PRICE_CHECK_INTERVAL_HOURS)
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
 load_dotenv()
 
 try:
@@ -23,312 +29,924 @@ except:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 def get_user_id():
-    """Generate unique user ID based on session"""
-    # On Streamlit Cloud, each user gets a unique session ID
-    # We'll use that to create a unique user ID
-    if 'user_id' not in st.session_state:
-        # Create a unique identifier for this session
-        session_id = st.session_state.get('_session_id', None)
-        if session_id is None:
-            # Generate a random ID if no session ID
-            import uuid
-            session_id = str(uuid.uuid4())
-            st.session_state._session_id = session_id
-        
-        # Create user_id from session_id
-        st.session_state.user_id = hashlib.md5(session_id.encode()).hexdigest()[:16]
-    
-    return st.session_state.user_id
+    """Return this session's user ID, a random 64-bit hex token created on first use"""
+    return st.session_state.setdefault('user_id', secrets.token_hex(8))
 
 # Import our custom scraper
 try:
-    from scraper import scrape_product_deals
+    from scraper import scrape_product_deals, scrape_product_deals_batch
     SCRAPING_ENABLED = True
 except ImportError:
     SCRAPING_ENABLED = False
     print("Warning: Scraper module not available, will use AI-generated deals only")
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
-
-def parse_json_response(json_string):
-    """
-    Parse JSON from GPT response, handling markdown code blocks
-    """
-    json_string = json_string.strip()
-    
-    # Remove markdown code blocks if present
-    if json_string.startswith("```json"):
-        json_string = json_string[7:]
-    elif json_string.startswith("```"):
-        json_string = json_string[3:]
-    
-    if json_string.endswith("```"):
-        json_string = json_string[:-3]
-    
-    json_string = json_string.strip()
-    
-    return json.loads(json_string)
-
-# Database setup
+# Shared resources, created once per process and reused across reruns
+@st.cache_resource
+def get_openai() -> "OpenAI":
+    """Return the process-wide OpenAI client (keeps its HTTP connection pool warm)"""
+    from openai import OpenAI  # imported on first API call, not at startup
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+@st.cache_resource
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop the scheduler's jobs run on (daemon thread)"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="price-check-loop", daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_async_openai() -> "AsyncOpenAI":
+    """Return the AsyncOpenAI client used on the background loop (pool reused across ticks)"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+@st.cache_resource
+def get_db() -> sqlite3.Connection:
+    """Return the process-wide SQLite connection; do not change its settings from callers"""
+    # Every query uses constant SQL text, so prepared statements are reused from this cache
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, timeout=DB_TIMEOUT, cached_statements=128)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    return conn
+
+@st.cache_resource
+def _db_write_lock() -> threading.Lock:
+    """Process-wide lock serializing writers (Streamlit sessions + scheduler thread)"""
+    return threading.Lock()
+
+@contextmanager
+def get_conn():
+    """Yield the shared connection inside a transaction, holding the writer lock"""
+    conn = get_db()
+    with _db_write_lock(), conn:
+        yield conn
+
+# Database setup (once per process)
+@st.cache_resource
 def init_db():
-    conn = sqlite3.connect('deals.db', check_same_thread=False)
-    c = conn.cursor()
+    with get_conn() as conn:
+        c = conn.cursor()
     
-    # Products table
-    c.execute('''CREATE TABLE IF NOT EXISTS products
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  user_id TEXT,
-                  product_name TEXT,
-                  target_price REAL,
-                  created_at TIMESTAMP,
-                  alert_enabled INTEGER DEFAULT 1)''')
+        # Products table
+        c.execute('''CREATE TABLE IF NOT EXISTS products
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      user_id TEXT,
+                      product_name TEXT,
+                      target_price REAL,
+                      created_at TIMESTAMP,
+                      alert_enabled INTEGER DEFAULT 1)''')
     
-    # Price history table
-    c.execute('''CREATE TABLE IF NOT EXISTS price_history
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  product_id INTEGER,
-                  retailer TEXT,
-                  price REAL,
-                  url TEXT,
-                  checked_at TIMESTAMP,
-                  FOREIGN KEY (product_id) REFERENCES products(id))''')
+        # Price history table
+        c.execute('''CREATE TABLE IF NOT EXISTS price_history
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      product_id INTEGER,
+                      retailer TEXT,
+                      price REAL,
+                      url TEXT,
+                      checked_at TIMESTAMP,
+                      FOREIGN KEY (product_id) REFERENCES products(id))''')
     
-    # Alerts table
-    c.execute('''CREATE TABLE IF NOT EXISTS alerts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  product_id INTEGER,
-                  alert_type TEXT,
-                  message TEXT,
-                  created_at TIMESTAMP,
-                  read INTEGER DEFAULT 0,
-                  FOREIGN KEY (product_id) REFERENCES products(id))''')
+        # Alerts table
+        c.execute('''CREATE TABLE IF NOT EXISTS alerts
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      product_id INTEGER,
+                      alert_type TEXT,
+                      message TEXT,
+                      created_at TIMESTAMP,
+                      read INTEGER DEFAULT 0,
+                      FOREIGN KEY (product_id) REFERENCES products(id))''')
     
-    conn.commit()
-    conn.close()
+        # Completions cached by request hash so restarts keep them
+        c.execute('''CREATE TABLE IF NOT EXISTS llm_cache
+                     (prompt_hash TEXT PRIMARY KEY,
+                      response TEXT,
+                      ts REAL)''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_ts ON llm_cache(ts)")
+    
+        # Indexes for the per-user, per-product and unread-alert lookups
+        c.execute("CREATE INDEX IF NOT EXISTS idx_products_user ON products(user_id, created_at DESC)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_products_alert ON products(alert_enabled) WHERE alert_enabled = 1")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_ph_product ON price_history(product_id, checked_at DESC)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_alerts_unread ON alerts(product_id, read, created_at DESC) WHERE read = 0")
+
+        # Refresh planner statistics so the indexes above are actually chosen
+        c.execute("PRAGMA optimize")
 
 # Database operations
-def add_product(user_id, product_name, target_price):
-    conn = sqlite3.connect('deals.db')
-    c = conn.cursor()
-    c.execute("INSERT INTO products (user_id, product_name, target_price, created_at) VALUES (?, ?, ?, ?)",
-              (user_id, product_name, target_price, datetime.now()))
-    product_id = c.lastrowid
-    conn.commit()
-    conn.close()
+def track_product(user_id, product_name, target_price, best_deal):
+    """Insert a product and its first price record in one transaction; returns the product id"""
+    with get_conn() as conn:
+        (product_id,) = conn.execute(
+            "INSERT INTO products (user_id, product_name, target_price, created_at) "
+            "VALUES (?, ?, ?, ?) RETURNING id",
+            (user_id, product_name, target_price, datetime.now())
+        ).fetchone()
+        conn.execute(PRICE_INSERT_SQL, price_record_row(product_id, best_deal['retailer'],
+                                                        best_deal['price'], best_deal['url']))
+    get_user_products.clear()
     return product_id
 
+@st.cache_data(ttl=30, show_spinner=False)
 def get_user_products(user_id):
-    conn = sqlite3.connect('deals.db')
-    df = pd.read_sql_query("SELECT * FROM products WHERE user_id = ? ORDER BY created_at DESC", 
-                           conn, params=(user_id,))
-    conn.close()
-    return df
-
-def get_price_history(product_id):
-    conn = sqlite3.connect('deals.db')
-    df = pd.read_sql_query("SELECT * FROM price_history WHERE product_id = ? ORDER BY checked_at DESC", 
-                           conn, params=(product_id,))
-    conn.close()
+    conn = get_db()
+    rows = conn.execute("SELECT id, product_name, target_price, created_at, alert_enabled FROM products "
+                        "WHERE user_id = ? ORDER BY created_at DESC", (user_id,)).fetchall()
+    # Immutable, picklable result for st.cache_data
+    return tuple(dict(row) for row in rows)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_price_history(product_id, limit=200, since_days=30):
+    """Recent price records (retailer, price, checked_at) for a product, newest first"""
+    conn = get_db()
+    rows = conn.execute("SELECT retailer, price, checked_at FROM price_history WHERE product_id = ? "
+                        "AND checked_at >= datetime('now', 'localtime', ?) "
+                        "ORDER BY checked_at DESC LIMIT ?", (product_id, f'-{since_days} days', limit)).fetchall()
+    return [dict(row) for row in rows]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_price_chart_data(product_id, limit=200, since_days=30):
+    """Recent (checked_at, price) points for the price chart, as a DataFrame"""
+    import pandas as pd
+    conn = get_db()
+    rows = conn.execute("SELECT checked_at, price FROM price_history WHERE product_id = ? "
+                        "AND checked_at >= datetime('now', 'localtime', ?) "
+                        "ORDER BY checked_at DESC LIMIT ?", (product_id, f'-{since_days} days', limit)).fetchall()
+    df = pd.DataFrame([tuple(row) for row in rows], columns=['checked_at', 'price'])
+    df['checked_at'] = pd.to_datetime(df['checked_at'])
     return df
 
-def add_price_record(product_id, retailer, price, url):
-    conn = sqlite3.connect('deals.db')
-    c = conn.cursor()
-    c.execute("INSERT INTO price_history (product_id, retailer, price, url, checked_at) VALUES (?, ?, ?, ?, ?)",
-              (product_id, retailer, price, url, datetime.now()))
-    conn.commit()
-    conn.close()
-
-def create_alert(product_id, alert_type, message):
-    conn = sqlite3.connect('deals.db')
-    c = conn.cursor()
-    c.execute("INSERT INTO alerts (product_id, alert_type, message, created_at) VALUES (?, ?, ?, ?)",
-              (product_id, alert_type, message, datetime.now()))
-    conn.commit()
-    conn.close()
-
+@st.cache_data(ttl=30, show_spinner=False)
+def get_price_summary(product_id):
+    """Return (current_price, lowest_price) for a product, or (None, None) without history"""
+    conn = get_db()
+    return tuple(conn.execute("""SELECT (SELECT price FROM price_history WHERE product_id = ? ORDER BY checked_at DESC LIMIT 1),
+                        MIN(price)
+                 FROM price_history WHERE product_id = ?""", (product_id, product_id)).fetchone())
+
+PRICE_INSERT_SQL = "INSERT INTO price_history (product_id, retailer, price, url, checked_at) VALUES (?, ?, ?, ?, ?)"
+ALERT_INSERT_SQL = "INSERT INTO alerts (product_id, alert_type, message, created_at) VALUES (?, ?, ?, ?)"
+
+def price_record_row(product_id, retailer, price, url):
+    """Build a price_history row for PRICE_INSERT_SQL"""
+    return (product_id, retailer, price, url, datetime.now())
+
+def alert_row(product_id, alert_type, message):
+    """Build an alerts row for ALERT_INSERT_SQL"""
+    return (product_id, alert_type, message, datetime.now())
+
+def save_check_results(price_rows, alert_rows):
+    """Insert batches of price_record_row/alert_row tuples in a single transaction"""
+    if not price_rows and not alert_rows:
+        return
+    with get_conn() as conn:
+        conn.executemany(PRICE_INSERT_SQL, price_rows)
+        conn.executemany(ALERT_INSERT_SQL, alert_rows)
+    if price_rows:
+        get_price_history.clear()
+        get_price_chart_data.clear()
+        get_price_summary.clear()
+    if alert_rows:
+        get_unread_alerts.clear()
+
+@st.cache_data(ttl=30, show_spinner=False)
 def get_unread_alerts(user_id):
-    conn = sqlite3.connect('deals.db')
+    conn = get_db()
     query = """
-    SELECT a.*, p.product_name 
+    SELECT a.id, a.message, a.created_at, p.product_name 
     FROM alerts a 
     JOIN products p ON a.product_id = p.id 
-    WHERE p.user_id = ? AND a.read = 0 
+    WHERE a.read = 0 AND p.user_id = ?
     ORDER BY a.created_at DESC
     """
-    df = pd.read_sql_query(query, conn, params=(user_id,))
-    conn.close()
-    return df
+    return tuple(dict(row) for row in conn.execute(query, (user_id,)).fetchall())
 
 def mark_alert_read(alert_id):
-    conn = sqlite3.connect('deals.db')
-    c = conn.cursor()
-    c.execute("UPDATE alerts SET read = 1 WHERE id = ?", (alert_id,))
-    conn.commit()
-    conn.close()
-
+    with get_conn() as conn:
+        conn.execute("UPDATE alerts SET read = 1 WHERE id = ?", (alert_id,))
+    get_unread_alerts.clear()
+
+# Persistent LLM response cache
+LLM_CACHE_TTL = 3600  # seconds
+
+def llm_cache_key(model, messages, response_format):
+    """sha1 of everything that shapes a completion"""
+    payload = json.dumps([model, messages, response_format], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def llm_cache_get(key):
+    """Cached response text for key, or None when missing or older than LLM_CACHE_TTL"""
+    row = get_db().execute("SELECT response FROM llm_cache WHERE prompt_hash = ? AND ts >= ?",
+                           (key, time.time() - LLM_CACHE_TTL)).fetchone()
+    return row[0] if row else None
+
+def llm_cache_put(key, response):
+    """Store a response and prune expired rows, so the table stays bounded on long-running servers"""
+    now = time.time()
+    with get_conn() as conn:
+        conn.execute("DELETE FROM llm_cache WHERE ts < ?", (now - LLM_CACHE_TTL,))
+        conn.execute("INSERT OR REPLACE INTO llm_cache (prompt_hash, response, ts) VALUES (?, ?, ?)",
+                     (key, response, now))
+
+
+# Models: the interactive path and the background scheduler can be tuned
+# separately (gpt-4.1-nano is already the fastest/cheapest tier)
+INTERACTIVE_MODEL = "gpt-4.1-nano"
+BACKGROUND_MODEL = "gpt-4.1-nano"
+
+# Output caps; latency grows with generated tokens
+DEALS_MAX_TOKENS = 400
+TIMING_MAX_TOKENS = 200
+DEALS_WITH_TIMING_MAX_TOKENS = 600
+
+# Structured-output schemas: the response format carries the field list,
+# so the prompts only need to say what to generate
+DEAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "retailer": {"type": "string"},
+        "price": {"type": "number"},
+        "original_price": {"type": "number"},
+        "discount_percentage": {"type": "integer"},
+        "url": {"type": "string"},
+        "availability": {"type": "string", "enum": ["In Stock", "Limited Stock"]},
+        "deal_quality": {"type": "string", "enum": ["Excellent", "Good", "Fair"]}
+    },
+    "required": ["retailer", "price", "original_price", "discount_percentage",
+                 "url", "availability", "deal_quality"],
+    "additionalProperties": False
+}
+
+TIMING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommendation": {"type": "string", "enum": ["buy_now", "wait"]},
+        "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+        "reasoning": {"type": "string"},
+        "expected_bf_discount": {"type": "integer"},
+        "risk_level": {"type": "string", "enum": ["low", "medium", "high"]}
+    },
+    "required": ["recommendation", "confidence", "reasoning",
+                 "expected_bf_discount", "risk_level"],
+    "additionalProperties": False
+}
+
+def _json_schema_format(name, schema):
+    """Build a strict json_schema response_format"""
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+DEALS_FORMAT = _json_schema_format("deals", {
+    "type": "object",
+    "properties": {"deals": {"type": "array", "items": DEAL_SCHEMA}},
+    "required": ["deals"],
+    "additionalProperties": False
+})
+
+TIMING_FORMAT = _json_schema_format("timing", TIMING_SCHEMA)
+
+# Bulk formats for the background job: one result per numbered product
+BULK_CHUNK_SIZE = 10  # products per bulk request
+
+def _bulk_format(name, item_properties):
+    """Strict format for a list of per-product results tagged with their prompt index"""
+    return _json_schema_format(name, {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": {
+            "type": "object",
+            "properties": {"index": {"type": "integer"}, **item_properties},
+            "required": ["index", *item_properties],
+            "additionalProperties": False
+        }}},
+        "required": ["results"],
+        "additionalProperties": False
+    })
+
+DEALS_WITH_TIMING_BULK_FORMAT = _bulk_format("deals_with_timing_bulk", {
+    "deals": {"type": "array", "items": DEAL_SCHEMA}, "analysis": TIMING_SCHEMA
+})
+
+TIMING_BULK_FORMAT = _bulk_format("timing_bulk", {"analysis": TIMING_SCHEMA})
+
+# Static system prompts: kept byte-identical across calls so the shared
+# prefix can be reused, with only the final user turn varying
+DEALS_SYSTEM_PROMPT = "Generate realistic Thanksgiving/Black Friday deals from different retailers with varied prices and example.com URLs."
+TIMING_SYSTEM_PROMPT = "It is Thanksgiving week. Judge whether to buy now or wait for Black Friday/Cyber Monday from pricing history, typical discounts, stock-out risk and category trends; keep reasoning brief."
+DEALS_WITH_TIMING_SYSTEM_PROMPT = "It is Thanksgiving week. Generate realistic deals from different retailers with varied prices and example.com URLs, then judge from their average price whether to buy now or wait for Black Friday/Cyber Monday; keep reasoning brief."
+BULK_PROMPT_SUFFIX = " Answer every numbered product with one result carrying its index."
+
+# Templates for the variable final user turn
+_DEALS_PROMPT_TMPL = string.Template("$n deals for: $p")
+_TIMING_PROMPT_TMPL = string.Template("$p, current average price $$$avg")
+
+# Prompt builders shared by the interactive and background paths
+def _deals_messages(product_name, max_results):
+    """Chat messages asking GPT for deal listings"""
+    return [
+        {"role": "system", "content": DEALS_SYSTEM_PROMPT},
+        {"role": "user", "content": _DEALS_PROMPT_TMPL.substitute(p=product_name, n=max_results)}
+    ]
+
+def _timing_messages(product_name, avg_price):
+    """Chat messages asking GPT whether to buy now or wait"""
+    return [
+        {"role": "system", "content": TIMING_SYSTEM_PROMPT},
+        {"role": "user", "content": _TIMING_PROMPT_TMPL.substitute(p=product_name, avg=f"{avg_price:.2f}")}
+    ]
+
+def _numbered(lines):
+    """One "index. line" row per item, the indexes the bulk formats echo back"""
+    return "\n".join(f"{i}. {line}" for i, line in enumerate(lines))
+
+def _deals_with_timing_bulk_messages(product_names, max_results):
+    """Chat messages asking GPT for deal listings and the timing analysis of several products"""
+    return [
+        {"role": "system", "content": DEALS_WITH_TIMING_SYSTEM_PROMPT + BULK_PROMPT_SUFFIX},
+        {"role": "user", "content": _numbered(_DEALS_PROMPT_TMPL.substitute(p=name, n=max_results)
+                                              for name in product_names)}
+    ]
+
+def _timing_bulk_messages(products):
+    """Chat messages asking GPT whether to buy now or wait for several (name, avg_price) pairs"""
+    return [
+        {"role": "system", "content": TIMING_SYSTEM_PROMPT + BULK_PROMPT_SUFFIX},
+        {"role": "user", "content": _numbered(_TIMING_PROMPT_TMPL.substitute(p=name, avg=f"{avg_price:.2f}")
+                                              for name, avg_price in products)}
+    ]
+
+# Fewer deals than this give no useful average, so the timing call is skipped
+# and the result is flagged instead of posing as a real analysis
+MIN_DEALS_FOR_TIMING = 3
+LOW_SIGNAL_TIMING = {
+    "low_signal": True,
+    "recommendation": None,
+    "confidence": "low",
+    "reasoning": "Not enough price samples to judge whether waiting would pay off."
+}
+
+def summarize_deals(deals):
+    """Return (best_deal, average_price) from one pass over a non-empty deal list"""
+    best = deals[0]
+    total = 0.0
+    for deal in deals:
+        price = deal['price']
+        total += price
+        if price < best['price']:
+            best = deal
+    return best, total / len(deals)
+
+def normalize_product_name(product_name):
+    """Canonical form of a product name, so "iPhone 15" and "iphone 15 " match"""
+    return product_name.strip().lower()
 
 # AI-powered deal finder using GPT-4o with real web scraping
 def search_deals_with_ai(product_name, max_results=5):
-    """Search for deals using real web scraping first, then AI enhancement"""   
-
-    # Try real web scraping first
-    if SCRAPING_ENABLED:
-        try:
-            st.info("🔍 Searching real retailers (Amazon, Walmart, Best Buy)...")
-            real_deals = scrape_product_deals(product_name, max_results=max_results)           
-
-            if real_deals and len(real_deals) > 0:
-                st.success(f"✅ Found {len(real_deals)} real deals from live retailers!")
-                return real_deals
-            else:
-                st.warning("⚠️ No results from web scraping, using AI analysis...")
-        except Exception as e:
-            st.warning(f"⚠️ Web scraping unavailable: {str(e)[:100]}. Using AI analysis...")    
-
-    # Fallback to AI-generated deals (for demo or when scraping fails)
-
-    st.info("🤖 Using AI to analyze deals...")
-    prompt = f"""You are a deal-finding assistant. Generate realistic Thanksgiving/Black Friday deal information for: {product_name}
-
-Return a JSON array with {max_results} deals from different retailers. Each deal should have:
-- retailer: store name (Amazon, Walmart, Target, Best Buy, etc.)
-- price: current price (realistic numbers)
-- original_price: original price before discount
-- discount_percentage: percentage off
-- url: example URL (use example.com/product)
-- availability: "In Stock" or "Limited Stock"
-- deal_quality: "Excellent", "Good", or "Fair"
-
-Make the prices realistic and varied. Include a mix of good and average deals.
-
-Return ONLY valid JSON, no other text."""
-
+    """Search for deals using real web scraping first, then AI enhancement"""
+    product_name = normalize_product_name(product_name)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-nano",
-            messages=[
-                {"role": "system", "content": "You are a helpful shopping assistant that returns only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        
-        deals_json = response.choices[0].message.content
-        print(deals_json)
-        deals = parse_json_response(deals_json)
-        print(deals)
-        return deals
+        real_deals = _scrape_deals(product_name, max_results)
+        if real_deals:
+            return real_deals
+
+        # Fallback to AI-generated deals (for demo or when scraping fails)
+        return _cached_streamed_deals(product_name, max_results)
     except json.JSONDecodeError as e:
         st.error(f"Error parsing deals JSON: {str(e)}")
-        st.error(f"Response was: {deals_json[:200]}...")
+        st.error(f"Response was: {e.doc[:200]}...")
         return []
     except Exception as e:
         st.error(f"Error searching deals: {str(e)}")
         return []
 
-def analyze_deal_timing(product_name, current_prices):
-    """Use GPT-4o to analyze if waiting for Black Friday/Cyber Monday would be better"""
-    
-    avg_price = sum([d['price'] for d in current_prices]) / len(current_prices) if current_prices else 0
-    
-    prompt = f"""Analyze whether a buyer should purchase {product_name} now (Thanksgiving week) or wait for Black Friday/Cyber Monday.
-
-Current average price: ${avg_price:.2f}
-Current date context: Mid-November, Thanksgiving week
-
-Consider:
-1. Historical pricing patterns for this product category
-2. Typical Black Friday/Cyber Monday discounts
-3. Stock availability risks
-4. Product category trends
+def _scrape_deals(product_name, max_results):
+    """Scrape live retailers with status messages; [] when scraping is unavailable or finds nothing"""
+    if not SCRAPING_ENABLED:
+        return []
 
-Return a JSON object with:
-{{
-    "recommendation": "buy_now" or "wait",
-    "confidence": "high", "medium", or "low",
-    "reasoning": "brief explanation",
-    "expected_bf_discount": estimated percentage (0-50),
-    "risk_level": "low", "medium", or "high" (for stock-outs)
-}}
+    try:
+        st.info("🔍 Searching real retailers (Amazon, Walmart, Best Buy)...")
+        real_deals = _scrape_deals_cached(product_name, max_results)
 
-Return ONLY valid JSON."""
+        if real_deals:
+            st.success(f"✅ Found {len(real_deals)} real deals from live retailers!")
+            return real_deals
+        else:
+            st.warning("⚠️ No results from web scraping, using AI analysis...")
+    except Exception as e:
+        st.warning(f"⚠️ Web scraping unavailable: {str(e)[:100]}. Using AI analysis...")
+    return []
+
+@st.cache_data(ttl=900, max_entries=512, show_spinner=False)
+def _scrape_deals_cached(product_name, max_results):
+    """Scrape live retailers; exceptions propagate so failures are never cached"""
+    return scrape_product_deals(product_name, max_results=max_results)
+
+# Streamed results can't go through st.cache_data (it would replay every
+# progress update), so they are kept in a small process-wide TTL store
+STREAMED_DEALS_TTL = 900  # seconds
+STREAMED_DEALS_MAX_ENTRIES = 512
+
+@st.cache_resource
+def _streamed_deals_store() -> dict:
+    """Process-wide {(product_name, max_results): (stored_at, deals)}"""
+    return {}
+
+@st.cache_resource
+def _streamed_deals_lock() -> threading.Lock:
+    """Guards _streamed_deals_store(); every session thread shares it"""
+    return threading.Lock()
+
+def _cached_streamed_deals(product_name, max_results):
+    """Return stream_deals() output, reusing results younger than STREAMED_DEALS_TTL"""
+    store, lock = _streamed_deals_store(), _streamed_deals_lock()
+    key = (product_name, max_results)
+    with lock:
+        hit = store.get(key)
+    if hit and time.monotonic() - hit[0] < STREAMED_DEALS_TTL:
+        return hit[1]
+
+    # Streamed outside the lock; it takes seconds and renders to this session
+    deals = stream_deals(product_name, max_results)
+    with lock:
+        if key not in store and len(store) >= STREAMED_DEALS_MAX_ENTRIES:
+            store.pop(min(store, key=lambda k: store[k][0]), None)
+        store[key] = (time.monotonic(), deals)
+    return deals
+
+def stream_deals(product_name, max_results=5):
+    """Generate AI deals with a streamed completion, showing progress as tokens arrive"""
+    messages = _deals_messages(product_name, max_results)
+    cache_key = llm_cache_key(INTERACTIVE_MODEL, messages, DEALS_FORMAT)
+    cached = llm_cache_get(cache_key)
+    if cached is not None:
+        return json.loads(cached)["deals"]
+
+    chunks = []
+    with st.status("🤖 Using AI to analyze deals...") as status:
+        stream = get_openai().chat.completions.create(
+            model=INTERACTIVE_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=DEALS_MAX_TOKENS,
+            response_format=DEALS_FORMAT,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                if len(chunks) % 20 == 0:
+                    status.update(label=f"🤖 Generating deals... ({len(chunks)} tokens)")
+        status.update(label="🤖 Deals generated", state="complete")
+    
+    deals_json = "".join(chunks)
+    deals = json.loads(deals_json)["deals"]
+    llm_cache_put(cache_key, deals_json)
+    return deals
 
+def analyze_deal_timing(product_name, current_prices, avg_price=None):
+    """Use GPT-4o to analyze if waiting for Black Friday/Cyber Monday would be better"""
+    if len(current_prices) < MIN_DEALS_FOR_TIMING:
+        return dict(LOW_SIGNAL_TIMING)
+    
+    # Callers that already summarized the deals pass avg_price to skip a second pass
+    if avg_price is None:
+        avg_price = summarize_deals(current_prices)[1]
+    
+    # Only the average price reaches the prompt, so hash that instead of the deal list
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-nano",
-            messages=[
-                {"role": "system", "content": "You are a shopping strategy expert. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5
-        )
-        
-        analysis_json = response.choices[0].message.content
-        analysis = parse_json_response(analysis_json)
-        return analysis
+        return _analyze_deal_timing_cached(normalize_product_name(product_name), round(avg_price, 2))
     except Exception as e:
         st.error(f"Error analyzing timing: {str(e)}")
         return None
 
+@st.cache_data(ttl=900, max_entries=512, show_spinner=False)
+def _analyze_deal_timing_cached(product_name, avg_price):
+    """Cached body of analyze_deal_timing keyed on the average price"""
+    messages = _timing_messages(product_name, avg_price)
+    cache_key = llm_cache_key(INTERACTIVE_MODEL, messages, TIMING_FORMAT)
+    cached = llm_cache_get(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+
+    response = get_openai().chat.completions.create(
+        model=INTERACTIVE_MODEL,
+        messages=messages,
+        temperature=0.5,
+        max_tokens=TIMING_MAX_TOKENS,
+        response_format=TIMING_FORMAT
+    )
+    
+    analysis_json = response.choices[0].message.content
+    analysis = json.loads(analysis_json)
+    llm_cache_put(cache_key, analysis_json)
+    return analysis
+
+# Async variants used by the background job
+_api_slot_lock = threading.Lock()
+_next_api_slot = 0.0
+
+async def _wait_for_api_slot():
+    """Space OpenAI calls so at most MAX_API_CALLS_PER_SECOND start each second"""
+    global _next_api_slot
+    with _api_slot_lock:
+        now = time.monotonic()
+        slot = max(now, _next_api_slot)
+        _next_api_slot = slot + 1.0 / MAX_API_CALLS_PER_SECOND
+    await asyncio.sleep(slot - now)
+
+async def _with_retries(make_call, attempts=3, base_delay=1.0):
+    """Await make_call(), retrying with exponential backoff on failure"""
+    for attempt in range(attempts):
+        try:
+            await _wait_for_api_slot()
+            return await make_call()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(base_delay * 2 ** attempt)
+
+async def scrape_deals_batch_async(product_names, max_results=5):
+    """Scrape live retailer deals for every name in one batch, off the event loop; [] per name on failure"""
+    if not SCRAPING_ENABLED or not product_names:
+        return [[] for _ in product_names]
+    try:
+        # One blocking batch call: the scraper overlaps the fetches itself and
+        # drives the shared Selenium driver from a single thread
+        return await asyncio.to_thread(scrape_product_deals_batch, product_names, max_results=max_results)
+    except Exception as e:
+        print(f"Web scraping unavailable for {product_names}: {str(e)[:100]}")
+        return [[] for _ in product_names]
+
+async def _completion_json_async(aclient, messages, temperature, max_tokens, response_format):
+    """Parsed JSON reply from the background model, served from llm_cache when possible"""
+    cache_key = llm_cache_key(BACKGROUND_MODEL, messages, response_format)
+    # SQLite calls block (the write lock may be held by a session), keep them off the loop
+    cached = await asyncio.to_thread(llm_cache_get, cache_key)
+    if cached is not None:
+        return json.loads(cached)
+
+    response = await _with_retries(lambda: aclient.chat.completions.create(
+        model=BACKGROUND_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        response_format=response_format
+    ))
+    reply = response.choices[0].message.content
+    result = json.loads(reply)
+    await asyncio.to_thread(llm_cache_put, cache_key, reply)
+    return result
+
+async def search_deals_with_timing_bulk_async(aclient, product_names, max_results=5):
+    """Generate AI deals and timing analysis for several products in one request: {name: (deals, analysis)}"""
+    result = await _completion_json_async(
+        aclient, _deals_with_timing_bulk_messages(product_names, max_results), 0.7,
+        DEALS_WITH_TIMING_MAX_TOKENS * len(product_names), DEALS_WITH_TIMING_BULK_FORMAT
+    )
+    return {product_names[item["index"]]: (item["deals"], item["analysis"])
+            for item in result["results"] if 0 <= item["index"] < len(product_names)}
+
+async def analyze_deal_timing_bulk_async(aclient, products):
+    """Timing analysis for several (product_name, avg_price) pairs in one request: {name: analysis}"""
+    result = await _completion_json_async(
+        aclient, _timing_bulk_messages(products), 0.5,
+        TIMING_MAX_TOKENS * len(products), TIMING_BULK_FORMAT
+    )
+    return {products[item["index"]][0]: item["analysis"]
+            for item in result["results"] if 0 <= item["index"] < len(products)}
+
 # Background job to check prices
-def check_all_products():
+async def check_all_products():
     """Background job that checks prices for all tracked products"""
-    conn = sqlite3.connect('deals.db')
-    c = conn.cursor()
+    conn = get_db()
+    
+    # Nothing tracked, nothing to do
+    if conn.execute("SELECT COUNT(1) FROM products WHERE alert_enabled = 1").fetchone()[0] == 0:
+        return
     
     # Get all products with alerts enabled
-    c.execute("SELECT id, product_name, target_price FROM products WHERE alert_enabled = 1")
-    products = c.fetchall()
-    conn.close()
+    products = conn.execute("SELECT id, product_name, target_price FROM products WHERE alert_enabled = 1").fetchall()
     
-    for product_id, product_name, target_price in products:
+    await _check_products_async(products)
+
+async def _check_products_async(products, max_concurrency=MAX_CONCURRENT_CHECKS):
+    """Scrape every product in one batch, then run up to max_concurrency OpenAI requests at once"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    price_rows, alert_rows = [], []
+
+    # Many users can track the same product, so query once per unique name
+    by_name = defaultdict(list)
+    for product in products:
+        by_name[normalize_product_name(product[1])].append(product)
+
+    # Jobs always run on the background loop, so its client can be shared
+    aclient = get_async_openai()
+
+    # Scrape every product in one batch first, then fan out only the LLM work
+    names = list(by_name)
+    updates = {}  # name -> (best_deal, analysis)
+    need_deals, need_timing = [], []
+    for name, deals in zip(names, await scrape_deals_batch_async(names, max_results=3)):
+        if not deals:
+            need_deals.append(name)
+            continue
+        best_deal, avg_price = summarize_deals(deals)
+        if len(deals) < MIN_DEALS_FOR_TIMING:
+            updates[name] = (best_deal, dict(LOW_SIGNAL_TIMING))
+        else:
+            updates[name] = (best_deal, None)
+            need_timing.append((name, avg_price))
+
+    async def fill_deals(chunk):
+        # No live deals: one request returns both the AI deals and the analysis
+        try:
+            async with semaphore:
+                results = await search_deals_with_timing_bulk_async(aclient, chunk, max_results=3)
+        except Exception as e:
+            print(f"Error checking products {chunk}: {str(e)}")
+            return
+        for name, (deals, analysis) in results.items():
+            updates[name] = ((summarize_deals(deals)[0] if deals else None), analysis)
+
+    async def fill_timing(chunk):
+        # On failure the scraped best deal is still recorded, without analysis
         try:
-            # Search for current deals
-            deals = search_deals_with_ai(product_name, max_results=3)
-            
-            if deals:
-                # Save best deal
-                best_deal = min(deals, key=lambda x: x['price'])
-                add_price_record(product_id, best_deal['retailer'], 
-                               best_deal['price'], best_deal['url'])
-                
-                # Check if price is below target
-                if best_deal['price'] <= target_price:
-                    message = f"🎉 Price Alert! {product_name} is now ${best_deal['price']:.2f} at {best_deal['retailer']} (Target: ${target_price:.2f})"
-                    create_alert(product_id, "price_alert", message)
-                
-                # Check timing recommendation
-                analysis = analyze_deal_timing(product_name, deals)
-                if analysis and analysis['recommendation'] == 'wait' and analysis['confidence'] == 'high':
-                    message = f"⏳ Timing Alert! Consider waiting for {product_name}. {analysis['reasoning']}"
-                    create_alert(product_id, "timing_alert", message)
-            
-            time.sleep(2)  # Rate limiting
+            async with semaphore:
+                results = await analyze_deal_timing_bulk_async(aclient, chunk)
         except Exception as e:
-            print(f"Error checking product {product_id}: {str(e)}")
+            print(f"Error analyzing timing for {[name for name, _ in chunk]}: {str(e)}")
+            return
+        for name, analysis in results.items():
+            updates[name] = (updates[name][0], analysis)
+
+    await asyncio.gather(
+        *[fill_deals(need_deals[i:i + BULK_CHUNK_SIZE]) for i in range(0, len(need_deals), BULK_CHUNK_SIZE)],
+        *[fill_timing(need_timing[i:i + BULK_CHUNK_SIZE]) for i in range(0, len(need_timing), BULK_CHUNK_SIZE)]
+    )
+
+    for name, rows in by_name.items():
+        if name not in updates:
             continue
+        best_deal, analysis = updates[name]
+        for product_id, product_name, target_price in rows:
+            _record_product_update(product_id, product_name, target_price, best_deal, analysis,
+                                   price_rows, alert_rows)
+
+    # Flush the whole tick in one transaction (one fsync instead of one per row)
+    save_check_results(price_rows, alert_rows)
+
+def _record_product_update(product_id, product_name, target_price, best_deal, analysis, price_rows, alert_rows):
+    """Append the price/alert rows one tracked product gets from a fetched update"""
+    if not best_deal:
+        return
+
+    # Save best deal
+    price_rows.append(price_record_row(product_id, best_deal['retailer'],
+                                       best_deal['price'], best_deal['url']))
+    
+    # Check if price is below target
+    if best_deal['price'] <= target_price:
+        message = f"🎉 Price Alert! {product_name} is now ${best_deal['price']:.2f} at {best_deal['retailer']} (Target: ${target_price:.2f})"
+        alert_rows.append(alert_row(product_id, "price_alert", message))
+    
+    # Check timing recommendation
+    if analysis and not analysis.get('low_signal') and analysis['recommendation'] == 'wait' and analysis['confidence'] == 'high':
+        message = f"⏳ Timing Alert! Consider waiting for {product_name}. {analysis['reasoning']}"
+        alert_rows.append(alert_row(product_id, "timing_alert", message))
 
-# Initialize scheduler
+# Initialize scheduler (once per process, shared by every session)
+@st.cache_resource
 def start_scheduler():
-    scheduler = BackgroundScheduler()
-    scheduler.start()
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    # Jobs run as tasks on one long-lived loop instead of a fresh loop per tick
+    loop = get_background_loop()
+    scheduler = AsyncIOScheduler(event_loop=loop)
     
-    # Run every 6 hours (adjust as needed for production)
+    # Run every PRICE_CHECK_INTERVAL_HOURS; skip a tick while the previous
+    # one is still running and collapse missed ticks into one run
     scheduler.add_job(
         func=check_all_products,
-        trigger=IntervalTrigger(hours=6),
+        trigger=IntervalTrigger(hours=PRICE_CHECK_INTERVAL_HOURS),
         id='price_check_job',
         name='Check product prices',
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=300,
         replace_existing=True
     )
+    # start() arms timers on the loop, so it has to run on the loop's thread
+    loop.call_soon_threadsafe(scheduler.start)
     
-    # Shut down the scheduler when exiting the app
-    atexit.register(lambda: scheduler.shutdown())
+    # Shut down the scheduler when exiting the app. Its timers live on the
+    # loop's thread, so shutdown runs there too, then the loop is stopped
+    def stop_loop(stopped):
+        loop.stop()
+        stopped.set()
+
+    def shutdown_on_loop(stopped):
+        try:
+            if scheduler.running:
+                scheduler.shutdown(wait=False)
+        finally:
+            # Queued behind the shutdown callback the scheduler itself schedules
+            loop.call_soon(stop_loop, stopped)
+
+    def stop_scheduler():
+        stopped = threading.Event()
+        loop.call_soon_threadsafe(shutdown_on_loop, stopped)
+        stopped.wait(timeout=5)
+
+    atexit.register(stop_scheduler)
     
     return scheduler
 
+# Static About tab content, built once at import
+_ABOUT_MD = f"""
+### 🎯 Features
+- **AI-Powered Deal Finding**: Uses GPT-4o to search and analyze deals across multiple retailers
+- **Smart Timing Analysis**: Predicts whether to buy now or wait for Black Friday/Cyber Monday
+- **Price Tracking**: Automatically monitors prices every {PRICE_CHECK_INTERVAL_HOURS} hours
+- **Intelligent Alerts**: Get notified when prices drop below your target
+- **Historical Analysis**: View price trends and make informed decisions
+
+### 🛠️ Technology Stack
+- **Frontend**: Streamlit
+- **AI Model**: GPT-4o (OpenAI)
+- **Scheduling**: APScheduler
+- **Database**: SQLite
+
+### 📝 How to Use
+1. Search for a product you want to buy
+2. Review current deals and timing recommendations
+3. Track products you're interested in
+4. Receive alerts when better deals appear
+5. Make informed purchase decisions!
+
+### ⚙️ Configuration
+- Price checks run every {PRICE_CHECK_INTERVAL_HOURS} hours
+- Alerts are generated for prices below target or timing changes
+- All data is stored locally in SQLite
+
+### 💡 Tips
+- Set realistic target prices based on current deals
+- Check multiple retailers for the same product
+- Pay attention to timing recommendations
+- Act quickly on "Excellent" deals with "High" confidence
+"""
+
+# UI fragments: widgets inside these rerun only their own fragment
+@st.fragment
+def _render_alerts(user_id):
+    """Sidebar list of unread alerts with their "Mark as Read" buttons"""
+    alerts = get_unread_alerts(user_id)
+
+    if alerts:
+        st.metric("Unread Alerts", len(alerts))
+        for alert in alerts:
+            with st.expander(f"{alert['product_name']}", expanded=True):
+                st.write(alert['message'])
+                st.caption(f"{alert['created_at']}")
+                if st.button("Mark as Read", key=f"alert_{alert['id']}"):
+                    mark_alert_read(alert['id'])
+                    st.rerun(scope="fragment")
+    else:
+        st.info("No new alerts")
+
+@st.fragment
+def _render_search_results():
+    """Results of the last search stored in st.session_state.last_search"""
+    if 'last_search' in st.session_state and st.session_state.last_search:
+        search_data = st.session_state.last_search
+        deals = search_data['deals']
+        product_search = search_data['product']
+        target_price = search_data['target_price']
+
+        if deals:
+            best_deal, avg_price = summarize_deals(deals)
+            st.success(f"Found {len(deals)} deals! 🏆 Best price: ${best_deal['price']:.2f} at {best_deal['retailer']}")
+
+            # Display deals as one table rather than a widget grid per deal
+
+            st.subheader("Current Deals")
+
+            quality_color = {"Excellent": "🟢", "Good": "🟡", "Fair": "🟠"}
+            st.dataframe(
+                [{
+                    "Retailer": deal['retailer'],
+                    "Product": deal.get('product_name') or "",
+                    "Price": deal['price'],
+                    "Discount": deal['discount_percentage'],
+                    "Quality": f"{quality_color.get(deal['deal_quality'], '⚪')} {deal['deal_quality']}",
+                    "Availability": deal['availability'],
+                    "Notes": " ".join(note for note, show in (
+                        ("🏆 Best Price", deal is best_deal),
+                        # Show if it's a real deal
+                        ("✨ Live Deal", bool(deal['url']) and 'example.com' not in deal['url'])
+                    ) if show),
+                    "Link": deal['url'],
+                } for deal in deals],
+                column_config={
+                    "Price": st.column_config.NumberColumn(format="$%.2f"),
+                    "Discount": st.column_config.NumberColumn(format="-%d%%"),
+                    "Link": st.column_config.LinkColumn(),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+            # Timing analysis
+
+            st.subheader("Should You Buy Now or Wait?")
+            with st.spinner("Analyzing timing strategy..."):
+                analysis = analyze_deal_timing(product_search, deals, avg_price=avg_price)                   
+
+                if analysis and analysis.get('low_signal'):
+                    st.info("ℹ️ Not enough deals to judge timing.")
+                elif analysis:
+                    col1, col2 = st.columns(2)                       
+
+                    with col1:
+                        if analysis['recommendation'] == 'wait':
+                            st.warning("💡 **Recommendation: Wait for Black Friday/Cyber Monday**")
+                        else:
+                            st.success("💡 **Recommendation: Buy Now**")                           
+
+                        st.write(analysis['reasoning'])
+
+                        st.caption(f"Confidence: {analysis['confidence'].title()}")                        
+
+                    with col2:
+
+                        st.metric("Expected BF Discount", f"{analysis['expected_bf_discount']}%")
+
+                        st.metric("Stock-out Risk", analysis['risk_level'].title())                
+
+            # Track product
+
+            st.divider()
+            if st.button("📌 Track This Product"):
+                # Save the product and its initial price data together
+                track_product(st.session_state.user_id, product_search, target_price, best_deal)
+
+                # Full-app rerun so the Tracked Products tab (outside this
+                # fragment) shows it; the confirmation survives via session_state
+                st.session_state.tracked_notice = product_search
+                st.rerun()
+
+            tracked = st.session_state.pop('tracked_notice', None)
+            if tracked:
+                st.success(f"✅ Now tracking {tracked}! You'll receive alerts when better deals appear.")
+
+                st.info("💡 Check the 'Tracked Products' tab to see your tracked items.")
+
+@st.fragment
+def _render_tracked_product(product):
+    """Body of one tracked-product expander in the Tracked Products tab"""
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        st.write(f"**Target Price:** ${product['target_price']:.2f}")
+        st.caption(f"Tracking since: {product['created_at']}")
+
+    with col2:
+        alert_status = "🟢 Active" if product['alert_enabled'] else "🔴 Paused"
+        st.write(f"Alerts: {alert_status}")
+
+    # Price history
+    chart_data = get_price_chart_data(product['id'])
+
+    if not chart_data.empty:
+        st.subheader("Price History")
+
+        # Create price chart
+        st.line_chart(chart_data.set_index('checked_at')['price'])
+
+        # Show latest prices
+        price_history = get_price_history(product['id'], limit=5)
+        st.dataframe(price_history, use_container_width=True)
+
+        # Current best price
+        current_price, best_price = get_price_summary(product['id'])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Current Best Price", f"${current_price:.2f}")
+        with col2:
+            st.metric("Lowest Price Seen", f"${best_price:.2f}")
+    else:
+        st.info(f"No price history yet. Price checks run every {PRICE_CHECK_INTERVAL_HOURS} hours.")
+
+@st.fragment
+def _render_about():
+    """About tab; static content, so it never needs a full-script rerun"""
+    st.header("About This App")
+    st.markdown(_ABOUT_MD)
+    st.divider()
+    st.caption("Built with ❤️ using Streamlit + GPT-4o")
+
 # Streamlit UI
 def main():
     st.set_page_config(
@@ -341,14 +959,11 @@ def main():
     # Initialize database
     init_db()
     
-    # Initialize scheduler (only once)
-    if 'scheduler_started' not in st.session_state:
-        start_scheduler()
-        st.session_state.scheduler_started = True
+    # Initialize scheduler
+    start_scheduler()
     
     # Session state for user ID (in production, use real auth)
-    if 'user_id' not in st.session_state:
-        st.session_state.user_id = get_user_id()
+    get_user_id()
     
     # Display user session info (optional, for debugging)
     with st.sidebar:
@@ -361,19 +976,7 @@ def main():
     # Sidebar - Alerts
     with st.sidebar:
         st.header("🔔 Alerts")
-        alerts = get_unread_alerts(st.session_state.user_id)
-        
-        if not alerts.empty:
-            st.metric("Unread Alerts", len(alerts))
-            for _, alert in alerts.iterrows():
-                with st.expander(f"{alert['product_name']}", expanded=True):
-                    st.write(alert['message'])
-                    st.caption(f"{alert['created_at']}")
-                    if st.button("Mark as Read", key=f"alert_{alert['id']}"):
-                        mark_alert_read(alert['id'])
-                        st.rerun()
-        else:
-            st.info("No new alerts")
+        _render_alerts(st.session_state.user_id)
     
     # Main tabs
     tab1, tab2, tab3 = st.tabs(["🔍 Search Deals", "📊 Tracked Products", "ℹ️ About"])
@@ -433,176 +1036,22 @@ def main():
             else:
                 st.warning("Please enter a product name") # Display results if we have a last search
 
-        if 'last_search' in st.session_state and st.session_state.last_search:
-            search_data = st.session_state.last_search
-            deals = search_data['deals']
-            product_search = search_data['product']
-            target_price = search_data['target_price']
-          
-            if deals:
-                st.success(f"Found {len(deals)} deals!")
-
-                # Display deals
-
-                st.subheader("Current Deals")
-
-                for i, deal in enumerate(deals):
-                    with st.container():
-                        col1, col2, col3, col4 = st.columns([3, 1, 1, 2])                      
-                        with col1:
-                            st.markdown(f"**{deal['retailer']}**")
-                            # Show product name if available (from real scraping)
-                            if 'product_name' in deal and deal['product_name']:
-                                st.caption(f"📦 {deal['product_name'][:80]}...")
-                            st.caption(f"🔗 {deal['url'][:50]}...")                      
-
-                        with col2:
-                            st.metric("Price", f"${deal['price']:.2f}", 
-                                    f"-{deal['discount_percentage']}%")                      
-
-                        with col3:
-                            quality_color = {"Excellent": "🟢", "Good": "🟡", "Fair": "🟠"}
-                            st.write(f"{quality_color.get(deal['deal_quality'], '⚪')} {deal['deal_quality']}")
-                            st.caption(deal['availability'])                        
-
-                        with col4:
-                            if i == 0:
-                                st.success("🏆 Best Price!")
-                            # Show if it's a real deal
-                            if deal['url'] and not 'example.com' in deal['url']:
-                                st.info("✨ Live Deal")    
-
-                        st.divider()                
-
-                # Timing analysis
-
-                st.subheader("Should You Buy Now or Wait?")
-                with st.spinner("Analyzing timing strategy..."):
-                    analysis = analyze_deal_timing(product_search, deals)                   
-
-                    if analysis:
-                        col1, col2 = st.columns(2)                       
-
-                        with col1:
-                            if analysis['recommendation'] == 'wait':
-                                st.warning("💡 **Recommendation: Wait for Black Friday/Cyber Monday**")
-                            else:
-                                st.success("💡 **Recommendation: Buy Now**")                           
-
-                            st.write(analysis['reasoning'])
-
-                            st.caption(f"Confidence: {analysis['confidence'].title()}")                        
-
-                        with col2:
-
-                            st.metric("Expected BF Discount", f"{analysis['expected_bf_discount']}%")
-
-                            st.metric("Stock-out Risk", analysis['risk_level'].title())                
-
-                # Track product
-
-                st.divider()
-                if st.button("📌 Track This Product"):
-                    product_id = add_product(st.session_state.user_id, product_search, target_price)                   
-
-                    # Save initial price data
-
-                    best_deal = min(deals, key=lambda x: x['price'])
-                    add_price_record(product_id, best_deal['retailer'], 
-                                   best_deal['price'], best_deal['url'])                    
-
-                    st.success(f"✅ Now tracking {product_search}! You'll receive alerts when better deals appear.")
-
-                    st.info("💡 Check the 'Tracked Products' tab to see your tracked items.")
+        _render_search_results()
     
     with tab2:
         st.header("Your Tracked Products")
         
         products = get_user_products(st.session_state.user_id)
         
-        if not products.empty:
-            for _, product in products.iterrows():
+        if products:
+            for product in products:
                 with st.expander(f"📦 {product['product_name']}", expanded=True):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.write(f"**Target Price:** ${product['target_price']:.2f}")
-                        st.caption(f"Tracking since: {product['created_at']}")
-                    
-                    with col2:
-                        alert_status = "🟢 Active" if product['alert_enabled'] else "🔴 Paused"
-                        st.write(f"Alerts: {alert_status}")
-                    
-                    # Price history
-                    price_history = get_price_history(product['id'])
-                    
-                    if not price_history.empty:
-                        st.subheader("Price History")
-                        
-                        # Create price chart
-                        chart_data = price_history[['checked_at', 'price', 'retailer']].copy()
-                        chart_data['checked_at'] = pd.to_datetime(chart_data['checked_at'])
-                        
-                        st.line_chart(chart_data.set_index('checked_at')['price'])
-                        
-                        # Show latest prices
-                        st.dataframe(
-                            price_history[['retailer', 'price', 'checked_at']].head(5),
-                            use_container_width=True
-                        )
-                        
-                        # Current best price
-                        best_price = price_history['price'].min()
-                        current_price = price_history.iloc[0]['price']
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Current Best Price", f"${current_price:.2f}")
-                        with col2:
-                            st.metric("Lowest Price Seen", f"${best_price:.2f}")
-                    else:
-                        st.info("No price history yet. Price checks run every 6 hours.")
+                    _render_tracked_product(product)
         else:
             st.info("You're not tracking any products yet. Search for deals in the 'Search Deals' tab!")
     
     with tab3:
-        st.header("About This App")
-        
-        st.markdown("""
-        ### 🎯 Features
-        - **AI-Powered Deal Finding**: Uses GPT-4o to search and analyze deals across multiple retailers
-        - **Smart Timing Analysis**: Predicts whether to buy now or wait for Black Friday/Cyber Monday
-        - **Price Tracking**: Automatically monitors prices every 6 hours
-        - **Intelligent Alerts**: Get notified when prices drop below your target
-        - **Historical Analysis**: View price trends and make informed decisions
-        
-        ### 🛠️ Technology Stack
-        - **Frontend**: Streamlit
-        - **AI Model**: GPT-4o (OpenAI)
-        - **Scheduling**: APScheduler
-        - **Database**: SQLite
-        
-        ### 📝 How to Use
-        1. Search for a product you want to buy
-        2. Review current deals and timing recommendations
-        3. Track products you're interested in
-        4. Receive alerts when better deals appear
-        5. Make informed purchase decisions!
-        
-        ### ⚙️ Configuration
-        - Price checks run every 6 hours
-        - Alerts are generated for prices below target or timing changes
-        - All data is stored locally in SQLite
-        
-        ### 💡 Tips
-        - Set realistic target prices based on current deals
-        - Check multiple retailers for the same product
-        - Pay attention to timing recommendations
-        - Act quickly on "Excellent" deals with "High" confidence
-        """)
-        
-        st.divider()
-        st.caption("Built with ❤️ using Streamlit + GPT-4o")
+        _render_about()
 
 if __name__ == "__main__":
     main()
@@ -62,6 +62,7 @@ TIMING_ANALYSIS = {
 
 # Rate Limiting
 API_RATE_LIMIT_DELAY = 2  # seconds between API calls
+MAX_API_CALLS_PER_SECOND = 3  # Global cap on background OpenAI calls
 MAX_SEARCHES_PER_USER_PER_DAY = 50
 
 # Feature Flags (enable/disable features)
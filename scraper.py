@@ -3,19 +3,27 @@ Web Scraper Module for Thanksgiving Deal Finder
 Streamlit-optimized version with persistent Chrome driver
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
+import asyncio
+import functools
+import operator
+import httpx
+from lxml import etree, html as lxml_html
+import orjson
 import time
-from urllib.parse import quote_plus, urljoin
+from types import MappingProxyType
+from urllib.parse import quote_plus, urljoin, urlparse
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional
 import platform
 import random
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
 import atexit
 from urllib.parse import unquote
 import os
@@ -43,19 +51,187 @@ def get_chrome_binary_path():
     else:
         return None  # Use default
 
+# Markers of bot-challenge pages served instead of search results
+CHALLENGE_MARKERS = ('captcha', 'robot check', 'access denied', 'are you a human')
+
+def looks_like_challenge(page_content: str) -> bool:
+    """True if the page is a bot check rather than real search results"""
+    lowered = page_content.lower()
+    return any(marker in lowered for marker in CHALLENGE_MARKERS)
+
+# Platform details don't change while running, so look them up once
+_SYSTEM = platform.system()
+_MACHINE = platform.machine()
+
+def _build_user_agent(chrome_version: str) -> str:
+    """
+    Generate appropriate user agent based on actual system
+    This makes requests look more legitimate
+    """
+    if _SYSTEM == 'Linux':
+        # Ubuntu/Linux user agents
+        if 'x86_64' in _MACHINE or 'AMD64' in _MACHINE:
+            return f'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+        else:
+            return f'Mozilla/5.0 (X11; Linux {_MACHINE}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+    
+    elif _SYSTEM == 'Darwin':  # macOS
+        return f'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+    
+    elif _SYSTEM == 'Windows':
+        return f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+    
+    else:
+        # Fallback to generic Linux
+        return f'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+
+# Detect Chrome version (common versions)
+_CHROME_UA_POOL = tuple(_build_user_agent(v) for v in ('120.0.0.0', '119.0.0.0', '121.0.0.0'))
+
+# Resources the parsers never read; blocking them cuts most of a page's bytes
+BLOCKED_URL_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg',
+    '*.woff', '*.woff2', '*.ttf', '*.mp4', '*.css',
+    '*googletagmanager*', '*doubleclick*', '*adsystem*', '*google-analytics*'
+]
+
+# Trim renderer processes and background work; the scraper never interacts with pages
+LOW_MEMORY_CHROME_ARGS = [
+    '--disable-features=TranslateUI,BackForwardCache,BlinkGenPropertyTrees,IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials',
+    '--renderer-process-limit=2',
+    '--js-flags=--max-old-space-size=256',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+]
+
+def _has_class(name: str) -> str:
+    """XPath predicate for elements whose class list contains name"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+# Lower-cased text of the context node, for case-insensitive contains()
+_LOWER_TEXT = 'translate(., "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")'
+
+# Selectors compiled once at import; string(...) yields '' when nothing matches
+AMZ_CARDS = etree.XPath('//div[@data-component-type="s-search-result"]')
+AMZ_TITLE = etree.XPath('string(.//h2[@class="a-size-medium a-spacing-none a-color-base a-text-normal"])')
+AMZ_PRICE = etree.XPath(f'string(.//span[{_has_class("a-price-whole")}])')
+AMZ_ORIGINAL_PRICE = etree.XPath(f'string(.//span[@class="a-price a-text-price"]//span[{_has_class("a-offscreen")}])')
+AMZ_LINK = etree.XPath('.//a[@class="a-link-normal s-no-outline"]/@href', smart_strings=False)
+# Amazon shows stock problems in its state/price-colored badges
+AMZ_OUT_OF_STOCK = etree.XPath(
+    f'boolean(.//span[{_has_class("a-color-state")} or {_has_class("a-color-price")}]'
+    f'[contains({_LOWER_TEXT}, "currently unavailable") or contains({_LOWER_TEXT}, "out of stock")])'
+)
+
+BBY_CARDS = etree.XPath('//li[@class="product-list-item product-list-item-gridView"]')
+BBY_TITLE = etree.XPath(f'string(.//h2[{_has_class("product-title")}])')
+BBY_PRICE = etree.XPath('string(.//span[@class="font-sans text-default text-style-body-md-400 font-500 text-6 leading-6"])')
+BBY_ORIGINAL_PRICE = etree.XPath('string(.//span[@class="font-sans text-default text-style-body-md-400"])')
+BBY_LINK = etree.XPath(f'.//div[{_has_class("sku-block-content-title")}]//a[{_has_class("product-list-item-link")}]/@href',
+                       smart_strings=False)
+# Best Buy replaces the add-to-cart button label when an item can't be bought
+BBY_OUT_OF_STOCK = etree.XPath(
+    f'boolean(.//button[contains({_LOWER_TEXT}, "sold out") or contains({_LOWER_TEXT}, "coming soon")])'
+)
+
+_ASIN_RE = re.compile(r'/dp/([A-Z0-9]{10})')
+_PRICE_STRIP = str.maketrans('', '', '$,')
+
+def _to_price(raw: str) -> float:
+    """Parse a scraped price like ' $1,299.99 '; 0.0 when missing or malformed"""
+    try:
+        return float(raw.translate(_PRICE_STRIP).strip())
+    except ValueError:
+        return 0.0
+
+# Deal quality by discount percentage, indexed 0..100
+_QUALITY_TABLE = ('Fair',) * 15 + ('Good',) * 15 + ('Excellent',) * 71
+
+def _quality(discount_percentage: int) -> str:
+    """Fair below 15% off, Good from 15%, Excellent from 30%"""
+    return _QUALITY_TABLE[min(max(discount_percentage, 0), 100)]
+
+class Deal(NamedTuple):
+    """One scraped product offer; converted to a dict only when leaving the scraper"""
+    retailer: str
+    product_name: str
+    price: float
+    original_price: float
+    discount_percentage: int
+    url: str
+    availability: str
+    deal_quality: str
+
+_NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+
+
+def _slice_next_data(page_content: str) -> Optional[str]:
+    """Cut the __NEXT_DATA__ JSON out of the raw page so the DOM never needs building"""
+    marker = page_content.find(_NEXT_DATA_MARKER)
+    if marker == -1:
+        return None
+    start = page_content.find('>', marker) + 1
+    end = page_content.find('</script>', start)
+    if not start or end == -1:
+        return None
+    return page_content[start:end]
+
+# Only LD scripts mentioning "Product"; WebSite/BreadcrumbList/Organization entries are never decoded
+WMT_LD_JSON = etree.XPath('//script[@type="application/ld+json"][contains(text(), \'"Product"\')]/text()',
+                          smart_strings=False)
+
 class DealScraper:
     """Scrapes product deals from various retailers using Selenium"""
     
     # Class-level driver to be shared across instances
     _driver = None
-    _driver_lock = False
+    # Held across driver creation and every whole page load/read sequence: the
+    # driver has one focused tab, and Streamlit sessions and the scheduler call
+    # in from different threads. Reentrant because _make_http_calls falls back
+    # to _make_http_call
+    _driver_lock = threading.RLock()
+    
+    # Politeness: minimum spacing between requests to the same host (seconds);
+    # different retailers are never delayed by each other
+    MIN_HOST_INTERVAL = 1.0
+    _last_hit: Dict[str, float] = {}
+    _last_hit_lock = threading.Lock()
+    
+    # Cap on plain-HTTP fetches in flight across a whole (batch) search
+    MAX_CONCURRENT_FETCHES = 8
+    
+    # Browser tabs loading at once when Selenium renders blocked pages; each
+    # chunk reuses the first tab and closes the rest afterwards
+    MAX_TABS = 4
+    
+    # Retailers searched by search_all_retailers / search_many
+    RETAILERS = ['Amazon', 'Best Buy']
+    
+    # Search page per retailer; {query} is the URL-encoded product name
+    SEARCH_URLS = {
+        'Amazon': "https://www.amazon.com/s?k={query}",
+        'Walmart': "https://www.walmart.com/search?q={query}",
+        'Best Buy': "https://www.bestbuy.com/site/searchpage.jsp?st={query}",
+    }
+    
+    # Element the parser reads for each retailer; Selenium waits for it instead of sleeping
+    READY_SELECTORS = {
+        'Amazon': 'div[data-component-type="s-search-result"]',
+        'Walmart': 'script#__NEXT_DATA__',
+        'Best Buy': 'li.product-list-item',
+    }
     
     def __init__(self, use_selenium=True, headless=True):
         """
         Initialize the scraper
         
         Args:
-            use_selenium: If True, use Selenium for all requests. If False, fall back to requests library
+            use_selenium: If True, render pages blocked over plain HTTP with Selenium
             headless: If True, run Chrome in headless mode
         """
         self.use_selenium = use_selenium
@@ -76,66 +252,83 @@ class DealScraper:
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0'
         }
-        
-        # Keep session as backup if selenium fails
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
 
     def _get_chrome_driver(self):
         """Get or create Chrome driver instance (cloud-compatible)"""
-        if DealScraper._driver is None:
-            try:
-                options = Options()
+        with DealScraper._driver_lock:
+            if DealScraper._driver is None:
+                try:
+                    options = Options()
+                
+                    if self.headless:
+                        options.add_argument('--headless=new')  # Use new headless mode
                 
-                if self.headless:
-                    options.add_argument('--headless=new')  # Use new headless mode
+                    # Essential Chrome options for stability
+                    options.add_argument('--no-sandbox')
+                    options.add_argument('--disable-dev-shm-usage')
+                    options.add_argument('--disable-blink-features=AutomationControlled')
+                    options.add_argument('--disable-extensions')
+                    options.add_argument('--disable-gpu')
+                    options.add_argument(f'user-agent={self.user_agent}')
+                    options.add_argument('--blink-settings=imagesEnabled=false')
+                    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+                    for arg in LOW_MEMORY_CHROME_ARGS:
+                        options.add_argument(arg)
                 
-                # Essential Chrome options for stability
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--disable-blink-features=AutomationControlled')
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-gpu')
-                options.add_argument(f'user-agent={self.user_agent}')
+                    # Streamlit Cloud's container is memory-bound; fold renderer into the browser process
+                    if os.path.exists('/usr/bin/chromium'):
+                        options.add_argument('--single-process')
                 
-                chrome_binary = get_chrome_binary_path()
-                if chrome_binary:
-                    options.binary_location = chrome_binary
+                    chrome_binary = get_chrome_binary_path()
+                    if chrome_binary:
+                        options.binary_location = chrome_binary
             
-                # Additional options to avoid detection
-                options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                options.add_experimental_option('useAutomationExtension', False)
+                    # Additional options to avoid detection
+                    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+                    options.add_experimental_option('useAutomationExtension', False)
                 
-                # Set page load strategy for faster loading
-                options.page_load_strategy = 'eager'
+                    # Set page load strategy for faster loading
+                    options.page_load_strategy = 'eager'
                 
-                # Use system chromedriver if available (Streamlit Cloud)
-                driver_path = get_chrome_driver_path()
-                if driver_path:
-                    service = Service(executable_path=driver_path)
-                    DealScraper._driver = webdriver.Chrome(service=service, options=options)
-                else:
-                    DealScraper._driver = webdriver.Chrome(options=options)
+                    # Use system chromedriver if available (Streamlit Cloud)
+                    driver_path = get_chrome_driver_path()
+                    if driver_path:
+                        service = Service(executable_path=driver_path)
+                        DealScraper._driver = webdriver.Chrome(service=service, options=options)
+                    else:
+                        DealScraper._driver = webdriver.Chrome(options=options)
                     
-                # Mask webdriver property
-                DealScraper._driver.execute_script(
-                    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-                )
+                    # Mask webdriver property
+                    DealScraper._driver.execute_script(
+                        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+                    )
                 
-                # Set timeouts
-                DealScraper._driver.set_page_load_timeout(30)
-                DealScraper._driver.implicitly_wait(10)
+                    self._block_heavy_resources(DealScraper._driver)
                 
-                # Register cleanup on exit
-                atexit.register(self._cleanup_driver)
+                    # Set timeouts
+                    # 'eager' returns on DOMContentLoaded, so 10s is plenty; no implicit
+                    # wait, readiness is handled by explicit WebDriverWaits
+                    DealScraper._driver.set_page_load_timeout(10)
                 
-                print("✅ Chrome driver initialized successfully")
+                    # Register cleanup on exit
+                    atexit.register(self._cleanup_driver)
                 
-            except Exception as e:
-                print(f"❌ Failed to initialize Chrome driver: {e}")
-                DealScraper._driver = None
+                    print("✅ Chrome driver initialized successfully")
+                
+                except Exception as e:
+                    print(f"❌ Failed to initialize Chrome driver: {e}")
+                    DealScraper._driver = None
                 
-        return DealScraper._driver
+            return DealScraper._driver
+
+    @staticmethod
+    def _block_heavy_resources(driver):
+        """Block images, fonts, media, CSS and trackers in the driver's current tab"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            print(f"⚠️ Could not enable resource blocking: {str(e)[:100]}")
 
     @classmethod
     def _cleanup_driver(cls):
@@ -149,188 +342,202 @@ class DealScraper:
             finally:
                 cls._driver = None
 
-    def _make_http_call(self, url: str, wait_time: int = 3) -> Optional[str]:
+    def _make_http_call(self, url: str, ready_selector: str, timeout: int = 10) -> Optional[str]:
         """
         Make HTTP call using Selenium to bypass anti-scraping measures
         
         Args:
             url: The URL to fetch
-            wait_time: Time to wait for page to load (seconds)
+            ready_selector: CSS selector of the element the parser needs
+            timeout: Max time to wait for that element (seconds)
             
         Returns:
             Page source HTML as string, or None if failed
         """
-        # Prevent concurrent access to driver
-        max_retries = 3
-        retry_count = 0
+        with DealScraper._driver_lock:
+            max_retries = 3
+            retry_count = 0
         
-        while retry_count < max_retries:
-            try:
-                # Get or create driver
-                driver = self._get_chrome_driver()
+            while retry_count < max_retries:
+                try:
+                    # Get or create driver
+                    driver = self._get_chrome_driver()
                 
-                if driver is None:
-                    print("⚠️ Driver not available, falling back to requests")
-                    return None
+                    if driver is None:
+                        print("⚠️ Driver not available, skipping browser fetch")
+                        return None
                 
-                # Navigate to URL
-                driver.get(url)
+                    # Navigate to URL
+                    time.sleep(self._host_delay(url))
+                    try:
+                        driver.get(url)
+                    except TimeoutException:
+                        # A slow ad/tracking request held up DOMContentLoaded; the results
+                        # are usually in the DOM already, so parse that instead of retrying
+                        print(f"⚠️ Page load timed out for {url}, using partial DOM")
+                        return driver.execute_script("return document.documentElement.outerHTML")
                 
-                # Wait for page to load
-                time.sleep(wait_time)
+                    # Wait until the element the parser reads is present
+                    try:
+                        WebDriverWait(driver, timeout).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+                        )
+                    except TimeoutException:
+                        pass  # e.g. no results; parse whatever loaded
                 
-                # Get page source
-                page_source = driver.page_source
+                    # Get page source
+                    page_source = driver.page_source
                 
-                return page_source
+                    return page_source
                 
-            except WebDriverException as e:
-                print(f"⚠️ WebDriver error (attempt {retry_count + 1}/{max_retries}): {str(e)[:100]}")
+                except WebDriverException as e:
+                    print(f"⚠️ WebDriver error (attempt {retry_count + 1}/{max_retries}): {str(e)[:100]}")
                 
-                # If driver is broken, reset it
-                if "invalid session id" in str(e).lower() or "chrome not reachable" in str(e).lower():
-                    self._cleanup_driver()
-                    DealScraper._driver = None
+                    # If driver is broken, reset it
+                    if "invalid session id" in str(e).lower() or "chrome not reachable" in str(e).lower():
+                        self._cleanup_driver()
+                        DealScraper._driver = None
                 
-                retry_count += 1
+                    retry_count += 1
                 
-                if retry_count < max_retries:
-                    time.sleep(2)
-                else:
-                    return None
+                    if retry_count < max_retries:
+                        time.sleep(2)
+                    else:
+                        return None
                     
-            except Exception as e:
-                print(f"❌ Error in Selenium call to {url}: {e}")
-                return None
+                except Exception as e:
+                    print(f"❌ Error in Selenium call to {url}: {e}")
+                    return None
     
-    def _get_user_agent(self):
-        """
-        Generate appropriate user agent based on actual system
-        This makes requests look more legitimate
+    def _make_http_calls(self, pages: List[tuple], timeout: int = 10) -> List[Optional[str]]:
         """
-        system = platform.system()
-        machine = platform.machine()
-        
-        # Detect Chrome version (common versions)
-        chrome_versions = ['120.0.0.0', '119.0.0.0', '121.0.0.0']
-        chrome_version = random.choice(chrome_versions)
-        
-        if system == 'Linux':
-            # Ubuntu/Linux user agents
-            if 'x86_64' in machine or 'AMD64' in machine:
-                return f'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
-            else:
-                return f'Mozilla/5.0 (X11; Linux {machine}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+        Load several (url, ready_selector) pages at once, one browser tab each
         
-        elif system == 'Darwin':  # macOS
-            return f'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+        WebDriver runs one command at a time, so instead of threads every tab
+        starts navigating via JS first and is then read in turn; the page loads
+        overlap inside Chrome. At most MAX_TABS pages load together and the
+        driver lock is released between chunks, so a large batch neither bloats
+        Chrome nor stalls interactive searches for its whole length.
+        """
+        page_sources = []
+        for start in range(0, len(pages), self.MAX_TABS):
+            page_sources.extend(self._load_in_tabs(pages[start:start + self.MAX_TABS], timeout))
+        return page_sources
+    
+    def _load_in_tabs(self, pages: List[tuple], timeout: int) -> List[Optional[str]]:
+        """One chunk of _make_http_calls; falls back to sequential _make_http_call on errors"""
+        with DealScraper._driver_lock:
+            if len(pages) <= 1:
+                return [self._make_http_call(url, selector, timeout) for url, selector in pages]
         
-        elif system == 'Windows':
-            return f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+            driver = self._get_chrome_driver()
+            if driver is None:
+                print("⚠️ Driver not available, skipping browser fetch")
+                return [None] * len(pages)
         
-        else:
-            # Fallback to generic Linux
-            return f'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{chrome_version} Safari/537.36'
+            try:
+                while len(driver.window_handles) < len(pages):
+                    driver.switch_to.new_window('tab')
+                    self._block_heavy_resources(driver)  # CDP settings are per tab
+                handles = driver.window_handles[:len(pages)]
+            
+                # Start every navigation without waiting for it; clearing the old
+                # document first keeps a previous search's results from matching
+                for handle, (url, _) in zip(handles, pages):
+                    driver.switch_to.window(handle)
+                    time.sleep(self._host_delay(url))
+                    driver.execute_script(
+                        "document.documentElement.innerHTML = ''; window.location.href = arguments[0];", url
+                    )
+            
+                page_sources = []
+                for handle, (_, selector) in zip(handles, pages):
+                    driver.switch_to.window(handle)
+                    try:
+                        WebDriverWait(driver, timeout).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                        )
+                    except TimeoutException:
+                        pass  # e.g. no results; parse whatever loaded
+                    page_sources.append(driver.page_source)
+                return page_sources
+            
+            except WebDriverException as e:
+                print(f"⚠️ Tabbed fetch failed, loading pages one by one: {str(e)[:100]}")
+                self._close_extra_tabs(driver)
+                return [self._make_http_call(url, selector, timeout) for url, selector in pages]
+            finally:
+                self._close_extra_tabs(driver)
+    
+    @staticmethod
+    def _close_extra_tabs(driver):
+        """Close every tab but the first and focus it, so idle tabs don't hold memory"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+        except WebDriverException as e:
+            print(f"⚠️ Could not close extra tabs: {str(e)[:100]}")
+    
+    def _get_user_agent(self):
+        """Pick a Chrome user agent matching this platform (pool built at import)"""
+        return random.choice(_CHROME_UA_POOL)
     
     def get_current_user_agent(self):
         """Return the current user agent being used"""
         return self.user_agent
     
-    def search_amazon(self, product_name: str, max_results: int = 3) -> List[Dict]:
+    def _host_delay(self, url: str) -> float:
+        """Reserve the next request slot for url's host; returns how long to wait for it"""
+        host = urlparse(url).netloc
+        with DealScraper._last_hit_lock:
+            now = time.monotonic()
+            slot = max(now, DealScraper._last_hit.get(host, 0.0) + self.MIN_HOST_INTERVAL)
+            DealScraper._last_hit[host] = slot
+        return slot - now
+    
+    def _search_url(self, retailer: str, product_name: str) -> str:
+        """Search page URL for a product at a retailer"""
+        return self.SEARCH_URLS[retailer].format(query=quote_plus(product_name))
+    
+    async def _fetch_async(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Plain HTTP GET; None on errors, non-200 responses and bot challenges"""
+        try:
+            await asyncio.sleep(self._host_delay(url))
+            response = await client.get(url)
+        except httpx.HTTPError as e:
+            print(f"⚠️ HTTP fetch failed for {url}: {str(e)[:100]}")
+            return None
+        if response.status_code != 200 or looks_like_challenge(response.text):
+            return None
+        return response.text
+    
+    def search_amazon(self, product_name: str, max_results: int = 3) -> List[Deal]:
         """Search Amazon for products"""
+        return self._search_retailer('Amazon', product_name, max_results)
+    
+    def parse_amazon(self, page_content, search_url: str, max_results: int = 3) -> List[Deal]:
+        """Parse an Amazon search results page into deals"""
         deals = []
         try:
-            search_url = f"https://www.amazon.com/s?k={quote_plus(product_name)}"
-            
-            # Use Selenium instead of session.get
-            if self.use_selenium:
-                page_content = self._make_http_call(search_url)
-                if not page_content:
-                    print("⚠️ Failed to fetch Amazon with Selenium, trying requests...")
-                    response = self.session.get(search_url, timeout=10)
-                    if response.status_code != 200:
-                        return deals
-                    page_content = response.content
-            else:
-                response = self.session.get(search_url, timeout=10)
-                if response.status_code != 200:
-                    return deals
-                page_content = response.content
-            
-            soup = BeautifulSoup(page_content, 'lxml')
-            
-            # Find product cards
-            products = soup.find_all('div', {'data-component-type': 's-search-result'}, limit=max_results)
-            for product in products:
+            tree = lxml_html.document_fromstring(page_content)
+            
+            # Extract field by field into parallel columns. The XPaths stay scoped
+            # per card so a missing field is '' rather than shifting later rows
+            cards = AMZ_CARDS(tree)[:max_results]
+            titles = [AMZ_TITLE(card).strip() for card in cards]
+            prices = [_to_price(AMZ_PRICE(card)) for card in cards]
+            original_prices = [_to_price(AMZ_ORIGINAL_PRICE(card)) for card in cards]
+            hrefs = [next(iter(AMZ_LINK(card)), '') for card in cards]
+            out_of_stock = [AMZ_OUT_OF_STOCK(card) for card in cards]
+            
+            for title, price, original_price, href, oos in zip(titles, prices, original_prices, hrefs, out_of_stock):
                 try:
-                    # Extract title
-                    title_elem = product.find('h2', class_='a-size-medium a-spacing-none a-color-base a-text-normal')
-                    if not title_elem:
-                        continue
-                    title = title_elem.get_text(strip=True)
-                    
-                    # Extract price
-                    price_elem = product.find('span', class_='a-price-whole')
-                    if not price_elem:
-                        continue
-                    price_str = price_elem.get_text(strip=True).replace(',', '').replace('$', '')
-                    price = float(price_str)
-                    # Extract original price (if on sale)
-                    original_price_elem = product.find('span', class_='a-price a-text-price')
-                    original_price_text = original_price_elem.find('span',class_='a-offscreen')
-                    original_price = price
-                    if original_price_text:
-                        original_str = original_price_text.get_text(strip=True).replace('$', '').replace(',', '')
-                        try:
-                            original_price = float(original_str)
-                        except:
-                            pass
-                    
-                    # Calculate discount
-                    discount_percentage = 0
-                    if original_price > price:
-                        discount_percentage = int(((original_price - price) / original_price) * 100)
-                    
-                    # Extract URL
-                    
-                    link_elem = product.find('a', class_='a-link-normal s-no-outline')
-                    if link_elem and link_elem.get('href'):
-                        href = unquote(link_elem['href'])  # Decode URL first
-                        
-                        # Extract ASIN (format: /dp/B0FLFD4W5R/)
-                        asin_match = re.search(r'/dp/([A-Z0-9]{10})', href)
-                        
-                        if asin_match:
-                            asin = asin_match.group(1)
-                            url = f"https://www.amazon.com/dp/{asin}"
-                        else:
-                            url = "https://www.amazon.com" + href.split('?')[0]  # Remove query params
-                    else:
-                        url = search_url
-                    
-                    # Check availability
-                    availability = "In Stock"
-                    if product.find(text=re.compile("Currently unavailable|Out of Stock", re.I)):
-                        availability = "Out of Stock"
-                    
-                    # Determine deal quality
-                    deal_quality = "Fair"
-                    if discount_percentage >= 30:
-                        deal_quality = "Excellent"
-                    elif discount_percentage >= 15:
-                        deal_quality = "Good"
-                    
-                    deals.append({
-                        'retailer': 'Amazon',
-                        'product_name': title[:100],  # Truncate long titles
-                        'price': price,
-                            'original_price': original_price,
-                        'discount_percentage': discount_percentage,
-                        'url': url,
-                        'availability': availability,
-                        'deal_quality': deal_quality
-                    })
-                    
+                    deal = self._build_amazon_deal(title, price, original_price, href, oos, search_url)
+                    if deal:
+                        deals.append(deal)
                 except Exception as e:
                     print(f"Error parsing Amazon product: {e}")
                     continue
@@ -341,35 +548,63 @@ class DealScraper:
             print(f"Error searching Amazon: {e}")
             return deals
     
-    def search_walmart(self, product_name: str, max_results: int = 3) -> List[Dict]:
-        """Search Walmart for products using Selenium"""
-        deals = []
-        try:
-            search_url = f"https://www.walmart.com/search?q={quote_plus(product_name)}"
-            
-            # Use Selenium instead of session.get
-            if self.use_selenium:
-                page_content = self._make_http_call(search_url, wait_time=5)
-                if not page_content:
-                    print("⚠️ Failed to fetch Walmart with Selenium, trying requests...")
-                    response = self.session.get(search_url, timeout=10)
-                    if response.status_code != 200:
-                        return deals
-                    page_content = response.content
-            else:
-                response = self.session.get(search_url, timeout=10)
-                if response.status_code != 200:
-                    return deals
-                page_content = response.content
+    def _build_amazon_deal(self, title: str, price: float, original_price: float, href: str,
+                           out_of_stock: bool, search_url: str) -> Optional[Deal]:
+        """Build one Amazon deal from its extracted columns; None without a title or price"""
+        if not title or not price:
+            return None
+        
+        # Original price (if on sale)
+        original_price = original_price or price
+        
+        # Calculate discount
+        discount_percentage = 0
+        if original_price > price:
+            discount_percentage = int(((original_price - price) / original_price) * 100)
+        
+        # Extract URL
+        if href:
+            href = unquote(href)  # Decode URL first
             
-            soup = BeautifulSoup(page_content, 'lxml')
+            # Extract ASIN (format: /dp/B0FLFD4W5R/)
+            asin_match = _ASIN_RE.search(href)
             
+            if asin_match:
+                asin = asin_match.group(1)
+                url = f"https://www.amazon.com/dp/{asin}"
+            else:
+                url = "https://www.amazon.com" + href.split('?')[0]  # Remove query params
+        else:
+            url = search_url
+        
+        # Determine deal quality
+        deal_quality = _quality(discount_percentage)
+        
+        return Deal(
+            retailer='Amazon',
+            product_name=title[:100],  # Truncate long titles
+            price=price,
+            original_price=original_price,
+            discount_percentage=discount_percentage,
+            url=url,
+            availability="Out of Stock" if out_of_stock else "In Stock",
+            deal_quality=deal_quality
+        )
+    
+    def search_walmart(self, product_name: str, max_results: int = 3) -> List[Deal]:
+        """Search Walmart for products"""
+        return self._search_retailer('Walmart', product_name, max_results)
+    
+    def parse_walmart(self, page_content, search_url: str, max_results: int = 3) -> List[Deal]:
+        """Parse a Walmart search results page into deals"""
+        deals = []
+        try:
             # Modern Walmart uses Next.js with data in __NEXT_DATA__ script
-            next_data_script = soup.find('script', id='__NEXT_DATA__')
+            next_data = _slice_next_data(page_content)
             
-            if next_data_script and next_data_script.string:
+            if next_data:
                 try:
-                    data = json.loads(next_data_script.string)
+                    data = orjson.loads(next_data)
                     
                     # Navigate to the search results
                     # Structure: data > props > pageProps > initialData > searchResult > itemStacks
@@ -386,17 +621,18 @@ class DealScraper:
                             if parsed_deal:
                                 deals.append(parsed_deal)
                                 
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"⚠️ Could not parse Walmart __NEXT_DATA__: {e}")
                 except Exception as e:
                     print(f"⚠️ Error extracting Walmart data: {e}")
             
             # Fallback: Try old JSON-LD method (in case Walmart changes back)
             if not deals:
-                scripts = soup.find_all('script', type='application/ld+json')
+                tree = lxml_html.document_fromstring(page_content)
+                scripts = WMT_LD_JSON(tree)
                 for script in scripts[:max_results]:
                     try:
-                        data = json.loads(script.string)
+                        data = orjson.loads(script)
                         
                         if isinstance(data, list):
                             for item in data:
@@ -417,7 +653,7 @@ class DealScraper:
             print(f"Error searching Walmart: {e}")
             return deals
     
-    def _parse_walmart_next_data(self, item_stack: Dict) -> Optional[Dict]:
+    def _parse_walmart_next_data(self, item_stack: Dict) -> Optional[Deal]:
         """Parse Walmart product data from Next.js __NEXT_DATA__ structure"""
         try:
             # The item data is typically nested in the item_stack
@@ -473,28 +709,24 @@ class DealScraper:
                     availability = "Out of Stock"
             
             # Determine deal quality
-            deal_quality = "Fair"
-            if discount_percentage >= 30:
-                deal_quality = "Excellent"
-            elif discount_percentage >= 15:
-                deal_quality = "Good"
-            
-            return {
-                'retailer': 'Walmart',
-                'product_name': name[:100],
-                'price': price,
-                'original_price': original_price,
-                'discount_percentage': discount_percentage,
-                'url': url,
-                'availability': availability,
-                'deal_quality': deal_quality
-            }
+            deal_quality = _quality(discount_percentage)
+            
+            return Deal(
+                retailer='Walmart',
+                product_name=name[:100],
+                price=price,
+                original_price=original_price,
+                discount_percentage=discount_percentage,
+                url=url,
+                availability=availability,
+                deal_quality=deal_quality
+            )
             
         except Exception as e:
             print(f"Error parsing Walmart product from __NEXT_DATA__: {e}")
             return None
     
-    def _parse_walmart_product(self, data: Dict) -> Dict:
+    def _parse_walmart_product(self, data: Dict) -> Optional[Deal]:
         """Parse Walmart product data from JSON-LD"""
         try:
             name = data.get('name', 'Unknown Product')
@@ -511,77 +743,49 @@ class DealScraper:
             original_price = price
             discount_percentage = 0
             
-            deal_quality = "Fair"
-            if discount_percentage >= 30:
-                deal_quality = "Excellent"
-            elif discount_percentage >= 15:
-                deal_quality = "Good"
-            
-            return {
-                'retailer': 'Walmart',
-                'product_name': name[:100],
-                'price': price,
-                'original_price': original_price,
-                'discount_percentage': discount_percentage,
-                'url': url,
-                'availability': availability,
-                'deal_quality': deal_quality
-            }
+            deal_quality = _quality(discount_percentage)
+            
+            return Deal(
+                retailer='Walmart',
+                product_name=name[:100],
+                price=price,
+                original_price=original_price,
+                discount_percentage=discount_percentage,
+                url=url,
+                availability=availability,
+                deal_quality=deal_quality
+            )
         except Exception as e:
             print(f"Error parsing Walmart product: {e}")
             return None
     
-    def search_bestbuy(self, product_name: str, max_results: int = 3) -> List[Dict]:
+    def search_bestbuy(self, product_name: str, max_results: int = 3) -> List[Deal]:
         """Search Best Buy for products"""
+        return self._search_retailer('Best Buy', product_name, max_results)
+    
+    def parse_bestbuy(self, page_content, search_url: str, max_results: int = 3) -> List[Deal]:
+        """Parse a Best Buy search results page into deals"""
         deals = []
         try:
-            search_url = f"https://www.bestbuy.com/site/searchpage.jsp?st={quote_plus(product_name)}"
-            
-            # Use Selenium instead of session.get
-            if self.use_selenium:
-                page_content = self._make_http_call(search_url)
-                if not page_content:
-                    print("⚠️ Failed to fetch Best Buy with Selenium, trying requests...")
-                    response = self.session.get(search_url, timeout=10)
-                    if response.status_code != 200:
-                        return deals
-                    page_content = response.content
-            else:
-                response = self.session.get(search_url, timeout=10)
-                if response.status_code != 200:
-                    return deals
-                page_content = response.content
-            
-            soup = BeautifulSoup(page_content, 'lxml')
+            tree = lxml_html.document_fromstring(page_content)
             
             # Find product listings
-            products = soup.find_all('li', class_='product-list-item product-list-item-gridView', limit=max_results)
+            products = BBY_CARDS(tree)[:max_results]
             
             for product in products:
                 try:
                     # Extract title
-                    title_elem = product.find('h2', class_='product-title')
-                    if not title_elem:
+                    title = BBY_TITLE(product).strip()
+                    if not title:
                         continue
-                    title = title_elem.get_text(strip=True)
                     
                     # Extract price
-                    price_elem = product.find('span', class_="font-sans text-default text-style-body-md-400 font-500 text-6 leading-6")
-                    if not price_elem:
+                    price = _to_price(BBY_PRICE(product))
+                    if not price:
                         continue
-                    price_str = price_elem.get_text(strip=True).replace('$', '').replace(',', '')
-                    price = float(price_str)
                     
                     # Extract original price
-                    original_price = price
-                    original_elem = product.find('span', class_="font-sans text-default text-style-body-md-400")
-                    if original_elem:
-                        was_price = original_elem.get_text(strip=True).replace(',', '').replace('$', '').strip()
-                        if was_price:
-                            try:
-                                original_price = float(was_price)
-                            except:
-                                pass
+                    original_price = _to_price(BBY_ORIGINAL_PRICE(product)) or price
                     
                     # Calculate discount
                     discount_percentage = 0
@@ -589,32 +793,27 @@ class DealScraper:
                         discount_percentage = int(((original_price - price) / original_price) * 100)
                     
                     # Extract URL
-                    link_elem = product.find('div', class_='sku-block-content-title')
-                    href=link_elem.find('a',class_='product-list-item-link')
-                    url = href['href'] if href else search_url
+                    hrefs = BBY_LINK(product)
+                    url = hrefs[0] if hrefs else search_url
                     
                     # Check availability
                     availability = "In Stock"
-                    if product.find(text=re.compile("Sold Out|Coming Soon", re.I)):
+                    if BBY_OUT_OF_STOCK(product):
                         availability = "Out of Stock"
                     
                     # Determine deal quality
-                    deal_quality = "Fair"
-                    if discount_percentage >= 30:
-                        deal_quality = "Excellent"
-                    elif discount_percentage >= 15:
-                        deal_quality = "Good"
+                    deal_quality = _quality(discount_percentage)
                     
-                    deals.append({
-                        'retailer': 'Best Buy',
-                        'product_name': title[:100],
-                        'price': price,
-                        'original_price': original_price,
-                        'discount_percentage': discount_percentage,
-                        'url': url,
-                        'availability': availability,
-                        'deal_quality': deal_quality
-                    })
+                    deals.append(Deal(
+                        retailer='Best Buy',
+                        product_name=title[:100],
+                        price=price,
+                        original_price=original_price,
+                        discount_percentage=discount_percentage,
+                        url=url,
+                        availability=availability,
+                        deal_quality=deal_quality
+                    ))
                     
                 except Exception as e:
                     print(f"Error parsing Best Buy product: {e}")
@@ -626,30 +825,90 @@ class DealScraper:
             print(f"Error searching Best Buy: {e}")
             return deals
     
-    def search_all_retailers(self, product_name: str, max_per_retailer: int = 2) -> List[Dict]:
+    def _search_retailer(self, retailer: str, product_name: str, max_results: int) -> List[Deal]:
+        """Search a single retailer through the same fetch/parse path as the batch search"""
+        return asyncio.run(self._search_many_async([product_name], max_results, retailers=[retailer]))[0]
+    
+    def search_all_retailers(self, product_name: str, max_per_retailer: int = 2) -> List[Deal]:
         """Search all retailers and combine results"""
-        all_deals = []
+        return asyncio.run(self._search_all_async(product_name, max_per_retailer))
+    
+    def search_many(self, product_names: List[str], max_per_retailer: int = 2) -> List[List[Deal]]:
+        """Search all retailers for several products in one event loop; results in input order"""
+        return asyncio.run(self._search_many_async(product_names, max_per_retailer))
+    
+    async def _search_many_async(self, product_names: List[str], max_per_retailer: int,
+                                 retailers: Optional[List[str]] = None) -> List[List[Deal]]:
+        """
+        Search every product at every retailer as one flat set of fetches
+        
+        All product x retailer pages share one HTTP client and one concurrency
+        cap, and blocked pages from every product go through a single
+        Selenium pass, so network waits overlap across the whole batch.
+        retailers defaults to RETAILERS.
+        """
+        retailers = retailers or self.RETAILERS
+        jobs = [(index, retailer) for index in range(len(product_names)) for retailer in retailers]
+        urls = [self._search_url(retailer, product_names[index]) for index, retailer in jobs]
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+        
+        async def fetch(client, url):
+            async with semaphore:
+                return await self._fetch_async(client, url)
+        
+        # Let httpx negotiate only the encodings it can decode
+        headers = {k: v for k, v in self.headers.items() if k != 'Accept-Encoding'}
+        async with httpx.AsyncClient(headers=headers, timeout=10, follow_redirects=True, http2=True,
+                                     limits=httpx.Limits(max_connections=16)) as client:
+            print(f"🔍 Searching {', '.join(retailers)}"
+                  + (f" for {len(product_names)} products..." if len(product_names) > 1 else "..."))
+            pages = await asyncio.gather(*[fetch(client, url) for url in urls])
         
-        # Search each retailer with delay to be respectful
-        retailers = [
-            ('Amazon', self.search_amazon),
-            ('Best Buy', self.search_bestbuy)
-        ]
+        # Blocked or failed over plain HTTP: render those with the browser, in parallel tabs
+        blocked = [i for i, page_content in enumerate(pages) if page_content is None]
+        if blocked and self.use_selenium:
+            print(f"⚠️ {', '.join(dict.fromkeys(jobs[i][1] for i in blocked))} needs a browser, retrying with Selenium...")
+            rendered = self._make_http_calls([(urls[i], self.READY_SELECTORS[jobs[i][1]]) for i in blocked])
+            for i, page_content in zip(blocked, rendered):
+                pages[i] = page_content
         
-        for retailer_name, search_func in retailers:
+        results = [[] for _ in product_names]
+        for (index, retailer_name), url, page_content in zip(jobs, urls, pages):
             try:
-                print(f"🔍 Searching {retailer_name}...")
-                deals = search_func(product_name, max_per_retailer)
-                all_deals.extend([d for d in deals if d is not None])
-                time.sleep(2)  # Respectful delay between retailers
+                if not page_content:
+                    continue
+                parse = _PARSERS[_site(url)]
+                deals = parse(self, page_content, url, max_per_retailer)
+                results[index].extend([d for d in deals if d is not None])
             except Exception as e:
                 print(f"❌ Error searching {retailer_name}: {e}")
                 continue
         
         # Sort by price (lowest first)
-        all_deals.sort(key=lambda x: x['price'])
+        for deals in results:
+            deals.sort(key=operator.attrgetter('price'))
         
-        return all_deals
+        return results
+    
+    async def _search_all_async(self, product_name: str, max_per_retailer: int) -> List[Deal]:
+        """Fetch every retailer concurrently, then parse; Selenium only for blocked pages"""
+        return (await self._search_many_async([product_name], max_per_retailer))[0]
+
+def _site(url: str) -> str:
+    """Registrable host of url, e.g. 'amazon.com' for https://www.amazon.com/s?k=..."""
+    return urlparse(url).netloc.removeprefix('www.')
+
+# Page parser per site; a new retailer registers here and search_all_retailers routes to it
+_PARSERS = {
+    'amazon.com': DealScraper.parse_amazon,
+    'walmart.com': DealScraper.parse_walmart,
+    'bestbuy.com': DealScraper.parse_bestbuy,
+}
+
+@functools.lru_cache(maxsize=None)
+def _get_scraper(use_selenium: bool = True, headless: bool = True) -> DealScraper:
+    """Shared DealScraper per configuration; the instances hold no per-search state"""
+    return DealScraper(use_selenium=use_selenium, headless=headless)
 
 def scrape_product_deals(product_name: str, max_results: int = 6, use_selenium: bool = True) -> List[Dict]:
     """
@@ -663,24 +922,45 @@ def scrape_product_deals(product_name: str, max_results: int = 6, use_selenium:
     Returns:
         List of deal dictionaries
     """
-    scraper = DealScraper(use_selenium=use_selenium)
+    scraper = _get_scraper(use_selenium)
     deals = scraper.search_all_retailers(product_name, max_per_retailer=max_results // 3 + 1)
-    return deals[:max_results]
+    return [deal._asdict() for deal in deals[:max_results]]
+
+def scrape_product_deals_batch(product_names: List[str], max_results: int = 6,
+                               use_selenium: bool = True) -> List[List[Dict]]:
+    """
+    Scrape deals for several products at once
+    
+    All retailer pages for all products are fetched in one event loop, sharing
+    the per-host throttle, and the Selenium fallback runs on that one thread.
+    
+    Args:
+        product_names: Products to search for
+        max_results: Maximum number of results per product
+        use_selenium: If True, use Selenium for blocked pages
+        
+    Returns:
+        One list of deal dictionaries per product, in input order
+    """
+    scraper = _get_scraper(use_selenium)
+    results = scraper.search_many(product_names, max_per_retailer=max_results // 3 + 1)
+    return [[deal._asdict() for deal in deals[:max_results]] for deals in results]
 
+@functools.lru_cache(maxsize=1)
 def get_scraper_info():
     """
     Get information about the scraper configuration
-    Useful for debugging
+    Useful for debugging; computed once and returned read-only
     """
-    scraper = DealScraper()
+    scraper = _get_scraper()
     
-    return {
-        'platform': platform.system(),
-        'machine': platform.machine(),
+    return MappingProxyType({
+        'platform': _SYSTEM,
+        'machine': _MACHINE,
         'user_agent': scraper.get_current_user_agent(),
         'python_version': platform.python_version(),
         'using_selenium': scraper.use_selenium
-    }
+    })
 
 if __name__ == "__main__":
     # Show scraper configuration when run directly
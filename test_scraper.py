@@ -3,28 +3,52 @@ Test script for the web scraper module
 Run this to verify scraping works before using in the app
 """
 
-from scraper import scrape_product_deals, get_scraper_info
+from scraper import scrape_product_deals_batch, get_scraper_info
 import json
+import sys
+
+_BAR60 = "=" * 60
+_DASH60 = "-" * 60
+
+_DEAL_TEMPLATE = (
+    "{i}. {retailer}\n"
+    "   Product: {product_name:.60}\n"
+    "   Price: ${price:.2f}\n"
+    "{discount}"
+    "   URL: {url:.60}...\n"
+    "   Status: {availability}\n\n"
+)
+
+_DISCOUNT_TEMPLATE = "   Discount: {discount_percentage}% off\n"
+
+def _format_deals(deals):
+    """Report blocks for a product's deals, formatted in one pass"""
+    return "".join(
+        _DEAL_TEMPLATE.format_map(deal | {
+            'i': i,
+            'product_name': deal.get('product_name', 'N/A'),
+            'discount': _DISCOUNT_TEMPLATE.format_map(deal) if deal['discount_percentage'] > 0 else "",
+        })
+        for i, deal in enumerate(deals, 1)
+    )
 
 def test_scraper():
-    print("=" * 60)
-    print("🧪 Testing Web Scraper")
-    print("=" * 60)
-    print()
+    # Each section goes out as one write and is flushed straight away, so
+    # progress stays visible even with line buffering off
+    write = sys.stdout.write
     
     # Show configuration
-    print("📋 Scraper Configuration:")
-    print("-" * 60)
     info = get_scraper_info()
-    print(f"Platform: {info['platform']}")
-    print(f"Machine: {info['machine']}")
-    print(f"Python: {info['python_version']}")
-    print()
-    print("User Agent:")
-    print(f"  {info['user_agent']}")
-    print()
-    print("✅ User agent automatically matched to your system!")
-    print()
+    write(
+        f"{_BAR60}\n🧪 Testing Web Scraper\n{_BAR60}\n\n"
+        f"📋 Scraper Configuration:\n{_DASH60}\n"
+        f"Platform: {info['platform']}\n"
+        f"Machine: {info['machine']}\n"
+        f"Python: {info['python_version']}\n\n"
+        f"User Agent:\n  {info['user_agent']}\n\n"
+        "✅ User agent automatically matched to your system!\n\n"
+    )
+    sys.stdout.flush()
     
     # Test products
     test_products = [
@@ -33,37 +57,34 @@ def test_scraper():
         "coffee maker"
     ]
     
-    for product in test_products:
-        print(f"\n📦 Testing: {product}")
-        print("-" * 60)
+    # One batched call; printing happens afterwards so output stays in order
+    try:
+        results = scrape_product_deals_batch(test_products, max_results=3)
+    except Exception as e:
+        print(f"❌ Error scraping test products: {str(e)}")
+        results = [[] for _ in test_products]
+    
+    for product, deals in zip(test_products, results):
+        buf = [f"\n📦 Testing: {product}\n"]
+        buf.append(_DASH60 + "\n")
         
         try:
-            deals = scrape_product_deals(product, max_results=3)
-            
             if deals:
-                print(f"✅ Found {len(deals)} deals:")
-                print()
-                
-                for i, deal in enumerate(deals, 1):
-                    print(f"{i}. {deal['retailer']}")
-                    print(f"   Product: {deal.get('product_name', 'N/A')[:60]}")
-                    print(f"   Price: ${deal['price']:.2f}")
-                    if deal['discount_percentage'] > 0:
-                        print(f"   Discount: {deal['discount_percentage']}% off")
-                    print(f"   URL: {deal['url'][:60]}...")
-                    print(f"   Status: {deal['availability']}")
-                    print()
+                buf.append(f"✅ Found {len(deals)} deals:\n\n" + _format_deals(deals))
             else:
-                print(f"⚠️  No deals found for {product}")
+                buf.append(f"⚠️  No deals found for {product}\n")
                 
         except Exception as e:
-            print(f"❌ Error testing {product}: {str(e)}")
+            buf.append(f"❌ Error testing {product}: {str(e)}\n")
         
-        print()
+        buf.append("\n")
+        write("".join(buf))
+        sys.stdout.flush()
     
-    print("=" * 60)
-    print("✅ Testing complete!")
-    print("=" * 60)
+    write(f"{_BAR60}\n✅ Testing complete!\n{_BAR60}\n")
+    sys.stdout.flush()
 
 if __name__ == "__main__":
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
     test_scraper()